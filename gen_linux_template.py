@@ -8,16 +8,110 @@ error handling, logging, and modularity.
 """
 
 import argparse
+import asyncio
+import concurrent.futures
 import logging
+import logging.handlers
 import os
+import queue
 import subprocess
 import sys
-import urllib.request
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 import json
 import time
 
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Upper bound on concurrent image downloads in process_all_images
+MAX_DOWNLOAD_WORKERS = 8
+
+# Size of the chunks streamed to disk while downloading images
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Timeout in seconds for connecting to and reading from image mirrors
+DOWNLOAD_TIMEOUT = 30
+
+# Timeout in seconds for pre-warming the connection to a mirror, and for how
+# long other downloads from that mirror wait for it
+PREWARM_TIMEOUT = 5
+
+# Upper bound on concurrent connections per mirror in process_all_images_async
+MAX_CONNECTIONS_PER_HOST = 4
+
+# Upper bound on templates being created at once in process_all_images_async
+MAX_CONCURRENT_TEMPLATES = 4
+
+# Number of log records buffered before they are written to the log file
+LOG_BUFFER_CAPACITY = 512
+
+
+def _probe(path: str) -> Optional[os.stat_result]:
+    """
+    Stat a path, so existence and size are known after a single syscall.
+    
+    Args:
+        path: Path to check
+        
+    Returns:
+        stat result for the path, or None if it doesn't exist
+    """
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _mirror_root(url: str) -> str:
+    """
+    Get the root URL of the mirror host an image is downloaded from.
+    
+    Args:
+        url: URL of the image
+        
+    Returns:
+        URL like https://host/
+    """
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+
+def _copy_image(src: str, dst: str) -> None:
+    """
+    Copy an image file inside the kernel using sendfile.
+    
+    Intended for preparing downloaded images (e.g. moving them to another
+    filesystem) without staging the data in user space.
+    
+    Args:
+        src: Path of the image to copy
+        dst: Path to copy the image to
+        
+    Raises:
+        IOError: If the source ends before its reported size was copied
+    """
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        size = os.fstat(s.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(d.fileno(), s.fileno(), offset, size - offset)
+            if sent == 0:
+                raise IOError(f"Short copy, got {offset} of {size} bytes")
+            offset += sent
+
 
 class ProxmoxTemplateGenerator:
     """Handles the creation of Proxmox VE templates from cloud images."""
@@ -31,26 +125,56 @@ class ProxmoxTemplateGenerator:
         """
         self.config = config
         self.setup_logging()
+        # Shared across download threads so connections to a mirror are reused
+        self.session = requests.Session()
+        # Cloud images are already compressed, don't ask for transfer encoding
+        self.session.headers['Accept-Encoding'] = 'identity'
+        # The SSH keyfile doesn't change during a run, resolve it only once
+        self._abs_ssh_keyfile = os.path.abspath(self.config['ssh_keyfile'])
+        self._ssh_key_present = os.path.isfile(self._abs_ssh_keyfile)
+        # Parsed templates.json and the mtime it was parsed at
+        self._images_cache = None
+        self._images_cache_mtime = None
+        # Storages pvesm already reported as available, failures are not
+        # remembered so they are checked again on the next validation
+        self._storage_ok = set()
         
     def setup_logging(self) -> None:
-        """Configure logging for the application."""
+        """
+        Configure logging for the application.
+        
+        Records for the log file are buffered and written in batches. The
+        buffer is flushed when it is full, on errors and on interpreter exit
+        (logging.shutdown closes all handlers).
+        """
+        log_format = '%(asctime)s - %(levelname)s - %(message)s'
+        target = logging.FileHandler('template_generation.log', delay=True)
+        target.setFormatter(logging.Formatter(log_format))
+        file_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=target
+        )
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
+            format=log_format,
             handlers=[
                 logging.StreamHandler(sys.stdout),
-                logging.FileHandler('template_generation.log')
+                file_handler
             ]
         )
         self.logger = logging.getLogger(__name__)
         
-    def run_command(self, command: List[str], check: bool = True) -> subprocess.CompletedProcess:
+    def run_command(self, command: List[str], check: bool = True,
+                    capture: bool = False) -> subprocess.CompletedProcess:
         """
         Execute a shell command with proper error handling.
         
         Args:
             command: List of command arguments
             check: Whether to raise CalledProcessError on non-zero exit code
+            capture: Whether to capture stdout, otherwise it is discarded
+                (stderr is always captured for error reporting)
             
         Returns:
             CompletedProcess object
@@ -59,24 +183,276 @@ class ProxmoxTemplateGenerator:
             subprocess.CalledProcessError: If command fails and check=True
         """
         try:
-            self.logger.debug(f"Executing command: {' '.join(command)}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Executing command: %s", ' '.join(command))
             result = subprocess.run(
                 command,
-                capture_output=True,
+                stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 check=check
             )
             if result.stdout:
-                self.logger.debug(f"Command output: {result.stdout}")
+                self.logger.debug("Command output: %s", result.stdout)
             return result
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Command failed: {' '.join(command)}")
             self.logger.error(f"Error output: {e.stderr}")
             raise
             
+    def _matches_remote(self, filename: str, size: int,
+                        content_length: Optional[str], etag: Optional[str]) -> bool:
+        """
+        Check whether a downloaded file matches the remote image.
+        
+        Args:
+            filename: Local filename of the downloaded image
+            size: Size of the local file in bytes
+            content_length: Content-Length header reported by the mirror
+            etag: ETag header reported by the mirror
+            
+        Returns:
+            True if size and ETag (where reported) match the local file
+        """
+        if content_length is not None and int(content_length) != size:
+            return False
+            
+        if etag is not None:
+            return self._read_etag(filename) == etag
+                
+        return True
+        
+    def _read_etag(self, filename: str) -> Optional[str]:
+        """
+        Read the ETag remembered for a downloaded image.
+        
+        Args:
+            filename: Local filename of the downloaded image
+            
+        Returns:
+            The stored ETag, or None if there is none
+        """
+        try:
+            with open(filename + '.etag', 'r') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+            
+    def _store_etag(self, filename: str, etag: Optional[str]) -> None:
+        """
+        Remember the ETag of a downloaded image in a sidecar file.
+        
+        Args:
+            filename: Local filename of the downloaded image
+            etag: ETag header reported by the mirror, if any
+        """
+        etag_file = filename + '.etag'
+        if etag is None:
+            try:
+                os.remove(etag_file)
+            except FileNotFoundError:
+                pass
+            return
+            
+        with open(etag_file, 'w') as f:
+            f.write(etag)
+            
+    def _is_up_to_date(self, url: str, filename: str, size: int) -> bool:
+        """
+        Check with a HEAD request whether an existing download is current.
+        
+        Args:
+            url: URL the file was downloaded from
+            filename: Local filename of the downloaded image
+            size: Size of the local file in bytes
+            
+        Returns:
+            True if the local file can be used as is, False otherwise
+        """
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.warning(f"Could not check {url} for updates, using existing {filename}: {e}")
+            return True
+            
+        return self._matches_remote(
+            filename,
+            size,
+            response.headers.get('Content-Length'),
+            response.headers.get('ETag')
+        )
+        
+    async def _is_up_to_date_async(self, session: "aiohttp.ClientSession", url: str,
+                                   filename: str, size: int) -> bool:
+        """
+        Check with a HEAD request whether an existing download is current.
+        
+        Args:
+            session: aiohttp client session to send the request with
+            url: URL the file was downloaded from
+            filename: Local filename of the downloaded image
+            size: Size of the local file in bytes
+            
+        Returns:
+            True if the local file can be used as is, False otherwise
+        """
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                response.raise_for_status()
+                headers = response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Could not check {url} for updates, using existing {filename}: {e}")
+            return True
+            
+        return self._matches_remote(
+            filename,
+            size,
+            headers.get('Content-Length'),
+            headers.get('ETag')
+        )
+        
+    def _log_download_done(self, filename: str, size: int, elapsed: float) -> None:
+        """
+        Log a single summary line for a finished download.
+        
+        Args:
+            filename: Local filename of the downloaded image
+            size: Number of bytes downloaded
+            elapsed: Download duration in seconds
+        """
+        rate = size / elapsed / (1 << 20) if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Successfully downloaded {filename} "
+            f"({size / (1 << 20):.1f} MiB in {elapsed:.1f}s, {rate:.1f} MiB/s)"
+        )
+        
+    async def run_command_async(self, command: List[str], check: bool = True) -> subprocess.CompletedProcess:
+        """
+        Execute a shell command from asyncio with proper error handling.
+        
+        Stdout is discarded, stderr is captured for error reporting.
+        
+        Args:
+            command: List of command arguments
+            check: Whether to raise CalledProcessError on non-zero exit code
+            
+        Returns:
+            CompletedProcess object
+            
+        Raises:
+            subprocess.CalledProcessError: If command fails and check=True
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Executing command: %s", ' '.join(command))
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        stderr = stderr.decode(errors='replace')
+        if check and process.returncode != 0:
+            self.logger.error(f"Command failed: {' '.join(command)}")
+            self.logger.error(f"Error output: {stderr}")
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stderr=stderr)
+        
+    def _resume_headers(self, tmp_filename: str) -> Dict[str, str]:
+        """
+        Build request headers to resume a partial download.
+        
+        Args:
+            tmp_filename: Temporary file the image is downloaded into
+            
+        Returns:
+            Range (and If-Range) headers if a partial download exists, an
+            empty dictionary otherwise
+        """
+        stat = _probe(tmp_filename)
+        if stat is None:
+            return {}
+            
+        headers = {'Range': f"bytes={stat.st_size}-"}
+        # Make the mirror send the whole image if it changed in the meantime
+        etag = self._read_etag(tmp_filename)
+        if etag is not None:
+            headers['If-Range'] = etag
+        return headers
+        
+    def _prepare_partial(self, filename: str, tmp_filename: str, status: int,
+                         headers) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        Prepare the temporary file for the body of a download response.
+        
+        Args:
+            filename: Local filename to save as
+            tmp_filename: Temporary file the image is downloaded into
+            status: HTTP status code of the response
+            headers: Response headers
+            
+        Returns:
+            Tuple of the mode to open the temporary file with and the size
+            the complete image must have (None if the mirror didn't say), or
+            None if the partial download was discarded and the download has
+            to be restarted
+            
+        Raises:
+            IOError: If the mirror responded with an unexpected status or range
+        """
+        if status == 416:
+            # The partial download doesn't fit the remote image anymore
+            self.logger.info(f"Cannot resume {tmp_filename}, restarting download")
+            os.remove(tmp_filename)
+            self._store_etag(tmp_filename, None)
+            return None
+            
+        if status == 200:
+            self._store_etag(tmp_filename, headers.get('ETag'))
+            content_length = headers.get('Content-Length')
+            return 'wb', int(content_length) if content_length is not None else None
+            
+        if status == 206:
+            # Content-Range: bytes <start>-<end>/<total>
+            content_range = headers.get('Content-Range', '')
+            self.logger.info(f"Resuming download of {filename} ({content_range})")
+            byte_range, _, total = content_range.partition('/')
+            stat = _probe(tmp_filename)
+            offset = stat.st_size if stat is not None else 0
+            if not byte_range.startswith(f"bytes {offset}-"):
+                raise IOError(f"Mirror sent range {content_range!r} for a resume at byte {offset}")
+            return 'ab', int(total) if total.isdigit() else None
+            
+        raise IOError(f"Unexpected HTTP status {status}")
+        
+    def _finish_download(self, filename: str, tmp_filename: str,
+                         expected_size: Optional[int], etag: Optional[str]) -> None:
+        """
+        Move a finished download into place after checking it is complete.
+        
+        An incomplete download is left in the temporary file, so the next
+        run can resume it.
+        
+        Args:
+            filename: Local filename to save as
+            tmp_filename: Temporary file the image was downloaded into
+            expected_size: Size the complete image must have, if known
+            etag: ETag header reported by the mirror, if any
+            
+        Raises:
+            IOError: If the temporary file is smaller or larger than expected
+        """
+        size = os.stat(tmp_filename).st_size
+        if expected_size is not None and size != expected_size:
+            raise IOError(f"Incomplete download, got {size} of {expected_size} bytes")
+            
+        os.replace(tmp_filename, filename)
+        self._store_etag(filename, etag)
+        self._store_etag(tmp_filename, None)
+        
     def download_file(self, url: str, filename: str) -> bool:
         """
-        Download a file from URL with progress tracking.
+        Download a file from URL.
         
         Args:
             url: URL to download from
@@ -88,26 +464,161 @@ class ProxmoxTemplateGenerator:
         try:
             self.logger.info(f"Downloading {filename} from {url}")
             
-            # Check if file already exists
-            if os.path.exists(filename):
-                self.logger.info(f"File {filename} already exists, skipping download")
-                return True
+            # Check if file already exists and matches the remote image
+            stat = _probe(filename)
+            if stat is not None:
+                if self._is_up_to_date(url, filename, stat.st_size):
+                    self.logger.info(f"File {filename} is up to date, skipping download")
+                    return True
+                self.logger.info(f"File {filename} is outdated or incomplete, downloading again")
                 
-            # Download with progress
-            def progress_hook(block_num, block_size, total_size):
-                if total_size > 0:
-                    percent = min(100, (block_num * block_size * 100) // total_size)
-                    if block_num % 10 == 0:  # Update every 10 blocks
-                        self.logger.info(f"Download progress: {percent}%")
+            # Stream into a temporary file and only move it into place once
+            # its size matches what the mirror announced, so an interrupted
+            # or truncated download is never mistaken for a finished one and
+            # can be resumed on the next run
+            tmp_filename = filename + '.part'
+            start = time.monotonic()
+            downloaded = 0
+            with self.session.get(
+                url,
+                headers=self._resume_headers(tmp_filename),
+                stream=True,
+                timeout=DOWNLOAD_TIMEOUT
+            ) as response:
+                partial = self._prepare_partial(filename, tmp_filename, response.status_code, response.headers)
+                if partial is None:
+                    return self.download_file(url, filename)
+                    
+                mode, expected_size = partial
+                with open(tmp_filename, mode) as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        downloaded += len(chunk)
                         
-            urllib.request.urlretrieve(url, filename, progress_hook)
-            self.logger.info(f"Successfully downloaded {filename}")
+                self._finish_download(filename, tmp_filename, expected_size, response.headers.get('ETag'))
+            self._log_download_done(filename, downloaded, time.monotonic() - start)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to download {filename}: {e}")
             return False
             
+    async def _download_async(self, session: "aiohttp.ClientSession", url: str, filename: str) -> bool:
+        """
+        Download a file from URL using an aiohttp session.
+        
+        Args:
+            session: aiohttp client session to download with
+            url: URL to download from
+            filename: Local filename to save as
+            
+        Returns:
+            True if download successful, False otherwise
+        """
+        try:
+            self.logger.info(f"Downloading {filename} from {url}")
+            
+            # Check if file already exists and matches the remote image
+            stat = _probe(filename)
+            if stat is not None:
+                if await self._is_up_to_date_async(session, url, filename, stat.st_size):
+                    self.logger.info(f"File {filename} is up to date, skipping download")
+                    return True
+                self.logger.info(f"File {filename} is outdated or incomplete, downloading again")
+                
+            tmp_filename = filename + '.part'
+            start = time.monotonic()
+            downloaded = 0
+            async with session.get(url, headers=self._resume_headers(tmp_filename)) as response:
+                partial = self._prepare_partial(filename, tmp_filename, response.status, response.headers)
+                if partial is None:
+                    return await self._download_async(session, url, filename)
+                    
+                mode, expected_size = partial
+                with open(tmp_filename, mode) as f:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        
+                self._finish_download(filename, tmp_filename, expected_size, response.headers.get('ETag'))
+            self._log_download_done(filename, downloaded, time.monotonic() - start)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to download {filename}: {e}")
+            return False
+            
+    def _template_steps(self, vm_id: int, vm_name: str,
+                        image_path: str) -> List[Tuple[str, List[str], Optional[str]]]:
+        """
+        Build the qm commands that turn a cloud image into a template.
+        
+        Args:
+            vm_id: VM ID for the template
+            vm_name: Name for the template
+            image_path: Absolute path to the cloud image file
+            
+        Returns:
+            List of (log message, command, failure message) tuples. Steps with
+            a failure message may fail without aborting the template creation.
+        """
+        # Settings that don't depend on the imported disk are passed to qm
+        # create directly: networking, serial display, memory/CPU defaults,
+        # SCSI controller, guest agent and user
+        create_command = [
+            "qm", "create", str(vm_id),
+            "--name", vm_name,
+            "--ostype", "l26",
+            "--net0", "virtio,bridge=vmbr0",
+            "--serial0", "socket",
+            "--vga", "serial0",
+            "--memory", "1024",
+            "--cores", "4",
+            "--cpu", "host",
+            "--scsihw", "virtio-scsi-single",
+            "--agent", "enabled=1,fstrim_cloned_disks=1",
+            "--ciuser", self.config['username']
+        ]
+        
+        # Import the disk and make it the boot device, then add the
+        # cloud-init device and IP settings in a single qm set call
+        import_path = f"{self.config['storage']}:0,import-from={image_path},discard=on"
+        set_command = [
+            "qm", "set", str(vm_id),
+            "--scsi0", import_path,
+            "--boot", "order=scsi0",
+            "--ide2", f"{self.config['storage']}:cloudinit",
+            "--ipconfig0", "ip6=auto,ip=dhcp"
+        ]
+        
+        # Import SSH key
+        if self._ssh_key_present:
+            set_command += ["--sshkeys", self._abs_ssh_keyfile]
+        else:
+            self.logger.warning(f"SSH keyfile {self.config['ssh_keyfile']} not found")
+            
+        return [
+            ("Creating new VM...", create_command, None),
+            ("Importing disk image...", set_command, None),
+            ("Resizing disk to 8G...", [
+                "qm", "disk", "resize", str(vm_id), "scsi0", "8G"
+            ], "Disk resize failed (likely already larger than 8G), continuing..."),
+            ("Converting VM to template...", [
+                "qm", "template", str(vm_id)
+            ], None)
+        ]
+        
+    def _remove_image(self, image_file: str) -> None:
+        """
+        Remove a downloaded image once its template has been created.
+        
+        Args:
+            image_file: Path to the cloud image file
+        """
+        self.logger.info(f"Removing downloaded file {image_file}")
+        os.remove(image_file)
+        self._store_etag(image_file, None)
+        
     def create_template(self, vm_id: int, vm_name: str, image_file: str) -> bool:
         """
         Create a Proxmox VE template from a cloud image.
@@ -124,106 +635,60 @@ class ProxmoxTemplateGenerator:
             self.logger.info(f"Creating template {vm_name} (ID: {vm_id})")
             
             # Check if image file exists
-            if not os.path.exists(image_file):
+            image_path = os.path.abspath(image_file)
+            if _probe(image_path) is None:
                 self.logger.error(f"Image file {image_file} not found")
                 return False
                 
-            # Create new VM
-            self.logger.info("Creating new VM...")
-            self.run_command([
-                "qm", "create", str(vm_id),
-                "--name", vm_name,
-                "--ostype", "l26"
-            ])
-            
-            # Configure networking
-            self.logger.info("Configuring networking...")
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--net0", "virtio,bridge=vmbr0"
-            ])
-            
-            # Configure display
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--serial0", "socket",
-                "--vga", "serial0"
-            ])
+            for message, command, failure_message in self._template_steps(vm_id, vm_name, image_path):
+                self.logger.info(message)
+                try:
+                    self.run_command(command)
+                except subprocess.CalledProcessError:
+                    if failure_message is None:
+                        raise
+                    self.logger.info(failure_message)
+                    
+            self._remove_image(image_file)
             
-            # Set memory, CPU, and type defaults
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--memory", "1024",
-                "--cores", "4",
-                "--cpu", "host"
-            ])
-            
-            # Import disk image
-            self.logger.info("Importing disk image...")
-            import_path = f"{self.config['storage']}:0,import-from={os.path.abspath(image_file)},discard=on"
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--scsi0", import_path
-            ])
-            
-            # Configure boot settings
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--boot", "order=scsi0",
-                "--scsihw", "virtio-scsi-single"
-            ])
-            
-            # Enable QEMU guest agent
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--agent", "enabled=1,fstrim_cloned_disks=1"
-            ])
+            self.logger.info(f"Successfully created template {vm_name}")
+            return True
             
-            # Add cloud-init device
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--ide2", f"{self.config['storage']}:cloudinit"
-            ])
+        except Exception as e:
+            self.logger.error(f"Failed to create template {vm_name}: {e}")
+            return False
             
-            # Configure IP settings
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--ipconfig0", "ip6=auto,ip=dhcp"
-            ])
+    async def create_template_async(self, vm_id: int, vm_name: str, image_file: str) -> bool:
+        """
+        Create a Proxmox VE template from a cloud image using asyncio.
+        
+        Args:
+            vm_id: VM ID for the template
+            vm_name: Name for the template
+            image_file: Path to the cloud image file
             
-            # Import SSH key
-            if os.path.exists(self.config['ssh_keyfile']):
-                self.run_command([
-                    "qm", "set", str(vm_id),
-                    "--sshkeys", self.config['ssh_keyfile']
-                ])
-            else:
-                self.logger.warning(f"SSH keyfile {self.config['ssh_keyfile']} not found")
-                
-            # Set username
-            self.run_command([
-                "qm", "set", str(vm_id),
-                "--ciuser", self.config['username']
-            ])
+        Returns:
+            True if template creation successful, False otherwise
+        """
+        try:
+            self.logger.info(f"Creating template {vm_name} (ID: {vm_id})")
             
-            # Resize disk to 8G
-            self.logger.info("Resizing disk to 8G...")
-            try:
-                self.run_command([
-                    "qm", "disk", "resize", str(vm_id), "scsi0", "8G"
-                ])
-            except subprocess.CalledProcessError:
-                self.logger.info("Disk resize failed (likely already larger than 8G), continuing...")
+            # Check if image file exists
+            image_path = os.path.abspath(image_file)
+            if _probe(image_path) is None:
+                self.logger.error(f"Image file {image_file} not found")
+                return False
                 
-            # Convert to template
-            self.logger.info("Converting VM to template...")
-            self.run_command([
-                "qm", "template", str(vm_id)
-            ])
-            
-            # Clean up downloaded file
-            self.logger.info(f"Removing downloaded file {image_file}")
-            os.remove(image_file)
+            for message, command, failure_message in self._template_steps(vm_id, vm_name, image_path):
+                self.logger.info(f"{message} ({vm_name})")
+                try:
+                    await self.run_command_async(command)
+                except subprocess.CalledProcessError:
+                    if failure_message is None:
+                        raise
+                    self.logger.info(failure_message)
+                    
+            self._remove_image(image_file)
             
             self.logger.info(f"Successfully created template {vm_name}")
             return True
@@ -236,16 +701,28 @@ class ProxmoxTemplateGenerator:
         """
         Get dictionary of available cloud images with their configurations.
         
+        The parsed templates file is cached and only reloaded when its
+        modification time changes.
+        
         Returns:
             Dictionary mapping image names to their configuration
         """
         templates_file = "templates.json"
         
         try:
-            with open(templates_file, 'r') as f:
-                templates = json.load(f)
-                self.logger.debug(f"Loaded {len(templates)} templates from {templates_file}")
-                return templates
+            mtime = os.stat(templates_file).st_mtime_ns
+            if self._images_cache is not None and mtime == self._images_cache_mtime:
+                return self._images_cache
+                
+            with open(templates_file, 'rb') as f:
+                data = f.read()
+                
+            # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+            templates = orjson.loads(data) if orjson is not None else json.loads(data)
+            self.logger.debug("Loaded %d templates from %s", len(templates), templates_file)
+            self._images_cache = templates
+            self._images_cache_mtime = mtime
+            return templates
         except FileNotFoundError:
             self.logger.error(f"Templates file {templates_file} not found")
             return {}
@@ -256,45 +733,284 @@ class ProxmoxTemplateGenerator:
             self.logger.error(f"Error loading templates from {templates_file}: {e}")
             return {}
         
-    def process_image(self, image_name: str) -> bool:
+    def _get_image_config(self, image_name: str) -> Optional[Dict]:
         """
-        Download and create template for a specific image.
+        Look up the configuration for a specific image.
         
         Args:
-            image_name: Name of the image to process
+            image_name: Name of the image to look up
             
         Returns:
-            True if successful, False otherwise
+            Image configuration dictionary, or None if the image is unknown
         """
         images = self.get_available_images()
         
         if image_name not in images:
             self.logger.error(f"Unknown image: {image_name}")
             self.logger.info(f"Available images: {', '.join(images.keys())}")
+            return None
+            
+        return images[image_name]
+        
+    def download_phase(self, image_name: str) -> bool:
+        """
+        Download the cloud image for a specific image.
+        
+        Args:
+            image_name: Name of the image to download
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        image_config = self._get_image_config(image_name)
+        if image_config is None:
             return False
             
-        image_config = images[image_name]
+        return self.download_file(image_config['url'], image_config['filename'])
         
-        # Download the image
-        if not self.download_file(image_config['url'], image_config['filename']):
+    def template_phase(self, image_name: str) -> bool:
+        """
+        Create the template for a specific, already downloaded image.
+        
+        Args:
+            image_name: Name of the image to create a template for
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        image_config = self._get_image_config(image_name)
+        if image_config is None:
             return False
             
-        # Create the template
         return self.create_template(
             image_config['vm_id'],
             image_config['vm_name'],
             image_config['filename']
         )
         
+    def process_image(self, image_name: str) -> bool:
+        """
+        Download and create template for a specific image.
+        
+        Args:
+            image_name: Name of the image to process
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.download_phase(image_name):
+            return False
+            
+        return self.template_phase(image_name)
+        
+    def _prewarm_connection(self, root: str) -> None:
+        """
+        Open a keep-alive connection to a mirror before downloading from it.
+        
+        Resolves the host and completes the TLS handshake once, so the
+        connection is waiting in the session's pool for the first download.
+        Failures are ignored, the download itself will report them.
+        
+        Args:
+            root: Root URL of the mirror
+        """
+        try:
+            self.session.head(root, timeout=PREWARM_TIMEOUT).close()
+        except requests.RequestException as e:
+            self.logger.debug("Could not pre-warm connection to %s: %s", root, e)
+            
+    async def _prewarm_connection_async(self, session: "aiohttp.ClientSession", root: str) -> None:
+        """
+        Open a keep-alive connection to a mirror before downloading from it.
+        
+        Args:
+            session: aiohttp client session whose pool should hold the connection
+            root: Root URL of the mirror
+        """
+        try:
+            async with session.head(root, timeout=aiohttp.ClientTimeout(total=PREWARM_TIMEOUT)):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.debug("Could not pre-warm connection to %s: %s", root, e)
+            
+    def _prewarm_and_download(self, warmups: Dict[str, threading.Event],
+                              url: str, filename: str) -> bool:
+        """
+        Download a file after the connection to its mirror has been pre-warmed.
+        
+        The first download from a mirror pre-warms the connection, later
+        downloads from the same mirror wait up to PREWARM_TIMEOUT for it so
+        they can reuse the connection instead of each opening their own.
+        
+        Args:
+            warmups: Dictionary mapping mirror root URLs to events that are
+                set once the connection to that mirror has been pre-warmed
+            url: URL to download from
+            filename: Local filename to save as
+            
+        Returns:
+            True if download successful, False otherwise
+        """
+        root = _mirror_root(url)
+        event = threading.Event()
+        warmed = warmups.setdefault(root, event)
+        if warmed is event:
+            try:
+                self._prewarm_connection(root)
+            finally:
+                warmed.set()
+        else:
+            warmed.wait(PREWARM_TIMEOUT)
+            
+        return self.download_file(url, filename)
+        
+    def _download_images(self, images: Dict[str, Dict], finished: queue.Queue) -> None:
+        """
+        Download images concurrently and report each one as it finishes.
+        
+        Args:
+            images: Dictionary mapping image names to their configuration
+            finished: Queue receiving (image_name, success) tuples, followed
+                by None once all downloads are done
+        """
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(MAX_DOWNLOAD_WORKERS, len(images))
+            ) as executor:
+                # Warm-ups are tracked per mirror, so a slow mirror only delays
+                # its own downloads
+                warmups = {}
+                futures = {
+                    executor.submit(
+                        self._prewarm_and_download, warmups, cfg['url'], cfg['filename']
+                    ): name
+                    for name, cfg in images.items()
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    finished.put((futures[future], future.result()))
+        finally:
+            finished.put(None)
+            
     def process_all_images(self) -> None:
-        """Download and create templates for all available images."""
+        """
+        Download and create templates for all available images.
+        
+        Images are downloaded concurrently in a background thread while
+        templates are created one after another as soon as their image is
+        available, since qm commands must not race on the same storage.
+        """
         images = self.get_available_images()
+        if not images:
+            self.logger.error("No images to process")
+            return
         
         self.logger.info(f"Processing {len(images)} images...")
         
-        for image_name in images:
+        finished = queue.Queue(maxsize=2)
+        downloader = threading.Thread(
+            target=self._download_images,
+            args=(images, finished),
+            daemon=True
+        )
+        downloader.start()
+        
+        while True:
+            item = finished.get()
+            if item is None:
+                break
+                
+            image_name, success = item
+            if not success:
+                self.logger.error(f"Failed to process {image_name}")
+                continue
+                
             self.logger.info(f"Processing {image_name}...")
-            if self.process_image(image_name):
+            if self.template_phase(image_name):
+                self.logger.info(f"Successfully processed {image_name}")
+            else:
+                self.logger.error(f"Failed to process {image_name}")
+                
+        downloader.join()
+        
+    async def process_image_async(self, session: "aiohttp.ClientSession",
+                                  templates: asyncio.Semaphore, image_name: str,
+                                  warmups: Dict[str, asyncio.Event]) -> bool:
+        """
+        Download and create template for a specific image using asyncio.
+        
+        The first download from a mirror pre-warms the connection, later
+        downloads from the same mirror wait up to PREWARM_TIMEOUT for it.
+        
+        Args:
+            session: aiohttp client session to download with
+            templates: Semaphore bounding concurrent template creations
+            image_name: Name of the image to process
+            warmups: Dictionary mapping mirror root URLs to events that are
+                set once the connection to that mirror has been pre-warmed
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        image_config = self._get_image_config(image_name)
+        if image_config is None:
+            return False
+            
+        root = _mirror_root(image_config['url'])
+        warmed = warmups.get(root)
+        if warmed is None:
+            warmed = warmups[root] = asyncio.Event()
+            try:
+                await self._prewarm_connection_async(session, root)
+            finally:
+                warmed.set()
+        else:
+            try:
+                await asyncio.wait_for(warmed.wait(), PREWARM_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+                
+        if not await self._download_async(session, image_config['url'], image_config['filename']):
+            return False
+            
+        async with templates:
+            return await self.create_template_async(
+                image_config['vm_id'],
+                image_config['vm_name'],
+                image_config['filename']
+            )
+            
+    async def process_all_images_async(self) -> None:
+        """
+        Download and create templates for all available images using asyncio.
+        
+        All images are downloaded concurrently over a shared aiohttp
+        connection pool. Each template is created as soon as its image is
+        available, with at most MAX_CONCURRENT_TEMPLATES VMs being set up at
+        the same time since every template uses its own VM ID.
+        """
+        images = self.get_available_images()
+        if not images:
+            self.logger.error("No images to process")
+            return
+        
+        self.logger.info(f"Processing {len(images)} images...")
+        
+        templates = asyncio.Semaphore(MAX_CONCURRENT_TEMPLATES)
+        connector = aiohttp.TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST)
+        timeout = aiohttp.ClientTimeout(sock_connect=DOWNLOAD_TIMEOUT, sock_read=DOWNLOAD_TIMEOUT)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={'Accept-Encoding': 'identity'}
+        ) as session:
+            warmups = {}
+            results = await asyncio.gather(*[
+                self.process_image_async(session, templates, image_name, warmups)
+                for image_name in images
+            ])
+            
+        for image_name, success in zip(images, results):
+            if success:
                 self.logger.info(f"Successfully processed {image_name}")
             else:
                 self.logger.error(f"Failed to process {image_name}")
@@ -308,21 +1024,24 @@ class ProxmoxTemplateGenerator:
         """
         # Check if qm command is available
         try:
-            self.run_command(["qm", "version"], check=False)
+            self.run_command(["qm", "version"], check=False, capture=True)
         except FileNotFoundError:
             self.logger.error("Proxmox VE qm command not found. Are you running this on a Proxmox host?")
             return False
             
         # Check if SSH keyfile exists
-        if not os.path.exists(self.config['ssh_keyfile']):
+        if not self._ssh_key_present:
             self.logger.warning(f"SSH keyfile {self.config['ssh_keyfile']} not found")
             
         # Check if storage exists
-        try:
-            self.run_command(["pvesm", "status", "--storage", self.config['storage']])
-        except subprocess.CalledProcessError:
-            self.logger.error(f"Storage {self.config['storage']} not found or not accessible")
-            return False
+        storage = self.config['storage']
+        if storage not in self._storage_ok:
+            try:
+                self.run_command(["pvesm", "status", "--storage", storage], capture=True)
+            except subprocess.CalledProcessError:
+                self.logger.error(f"Storage {storage} not found or not accessible")
+                return False
+            self._storage_ok.add(storage)
             
         return True
 
@@ -362,6 +1081,7 @@ def main():
         epilog="""
 Examples:
   %(prog)s --all                           # Create all templates
+  %(prog)s --all --async                   # Create all templates concurrently with asyncio
   %(prog)s --image debian-12               # Create only Debian 12 template
   %(prog)s --config my_config.json         # Use custom config file
   %(prog)s --list                          # List available images
@@ -380,6 +1100,13 @@ Examples:
         help="Create template for specific image"
     )
     
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Download images and create up to %d templates at a time concurrently, using asyncio and aiohttp (with --all)" % MAX_CONCURRENT_TEMPLATES
+    )
+    
     parser.add_argument(
         "--config",
         type=str,
@@ -400,6 +1127,9 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.use_async and not args.all:
+        parser.error("--async requires --all")
+        
     # Load configuration
     config = load_config(args.config)
     
@@ -438,7 +1168,13 @@ Examples:
         
     # Process images
     if args.all:
-        generator.process_all_images()
+        if args.use_async:
+            if aiohttp is None:
+                print("The --async option requires the aiohttp package")
+                sys.exit(1)
+            asyncio.run(generator.process_all_images_async())
+        else:
+            generator.process_all_images()
     elif args.image:
         if not generator.process_image(args.image):
             sys.exit(1)
@@ -7,7 +7,7 @@ This script tests the basic functionality without actually creating templates.
 
 import sys
 import os
-from gen_linux_template import ProxmoxTemplateGenerator, load_config
+from gen_linux_template import ProxmoxTemplateGenerator, load_config, _copy_image
 
 
 def test_config_loading():
@@ -88,6 +88,185 @@ def test_image_listing():
     return True
 
 
+def test_templates_cache():
+    """Test that templates.json is parsed only once."""
+    print("Testing templates cache...")
+    
+    config = load_config()
+    generator = ProxmoxTemplateGenerator(config)
+    first = generator.get_available_images()
+    second = generator.get_available_images()
+    
+    if not first or first is not second:
+        print("❌ templates.json was parsed again")
+        return False
+    
+    print("✅ Templates are cached")
+    return True
+
+
+def test_download_freshness():
+    """Test comparison of a downloaded image against remote headers."""
+    print("Testing download freshness check...")
+    
+    import tempfile
+    
+    config = load_config()
+    generator = ProxmoxTemplateGenerator(config)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'image.qcow2')
+        with open(filename, 'wb') as f:
+            f.write(b'x' * 16)
+        generator._store_etag(filename, '"abc"')
+        
+        if not generator._matches_remote(filename, 16, '16', '"abc"'):
+            print("❌ Unchanged image reported as outdated")
+            return False
+        if generator._matches_remote(filename, 16, '32', '"abc"'):
+            print("❌ Truncated image reported as up to date")
+            return False
+        if generator._matches_remote(filename, 16, '16', '"def"'):
+            print("❌ Changed image reported as up to date")
+            return False
+    
+    print("✅ Download freshness check works")
+    return True
+
+
+def test_download_resume():
+    """Test resuming, restarting and verifying downloads against a local server."""
+    print("Testing download resume...")
+    
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    data = os.urandom(256 * 1024)
+    
+    class ImageHandler(BaseHTTPRequestHandler):
+        etag = '"v1"'
+        truncate = False
+        
+        def log_message(self, *args):
+            pass
+            
+        def do_GET(self):
+            start = 0
+            range_header = self.headers.get('Range')
+            if_range = self.headers.get('If-Range')
+            if range_header and if_range in (None, self.etag):
+                start = int(range_header[len('bytes='):].rstrip('-'))
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', str(len(data) - start))
+            self.end_headers()
+            body = data[start:]
+            self.wfile.write(body[:1000] if self.truncate else body)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/image.qcow2"
+    
+    config = load_config()
+    generator = ProxmoxTemplateGenerator(config)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'image.qcow2')
+            tmp_filename = filename + '.part'
+            
+            def download(part=None, part_etag=None):
+                for path in (filename, filename + '.etag'):
+                    if os.path.exists(path):
+                        os.remove(path)
+                if part is not None:
+                    with open(tmp_filename, 'wb') as f:
+                        f.write(part)
+                    generator._store_etag(tmp_filename, part_etag)
+                return generator.download_file(url, filename)
+                
+            def complete():
+                if os.path.exists(tmp_filename):
+                    return False
+                with open(filename, 'rb') as f:
+                    return f.read() == data
+            
+            cases = [
+                ("Fresh download (200)", None, None),
+                ("Resumed download (206)", data[:5000], '"v1"'),
+                ("Changed image (If-Range)", b'x' * 5000, '"v0"'),
+                ("Unresumable download (416)", data + b'x', '"v1"'),
+            ]
+            for name, part, part_etag in cases:
+                if not download(part, part_etag) or not complete():
+                    print(f"❌ {name} failed")
+                    return False
+            
+            ImageHandler.truncate = True
+            if download() or os.path.exists(filename) or not os.path.exists(tmp_filename):
+                print("❌ Truncated download was accepted")
+                return False
+            
+            ImageHandler.truncate = False
+            if not generator.download_file(url, filename) or not complete():
+                print("❌ Truncated download was not resumed")
+                return False
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    print("✅ Download resume works")
+    return True
+
+
+def test_image_copy():
+    """Test copying an image file with sendfile."""
+    print("Testing image copy...")
+    
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, 'src.qcow2')
+        dst = os.path.join(tmpdir, 'dst.qcow2')
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        with open(src, 'wb') as f:
+            f.write(data)
+        
+        _copy_image(src, dst)
+        
+        with open(dst, 'rb') as f:
+            if f.read() != data:
+                print("❌ Copied image differs from source")
+                return False
+        
+        # Simulate a source that ends before its reported size
+        real_sendfile = os.sendfile
+        def short_sendfile(out_fd, in_fd, offset, count):
+            return real_sendfile(out_fd, in_fd, offset, min(count, 1024)) if offset == 0 else 0
+        
+        os.sendfile = short_sendfile
+        try:
+            _copy_image(src, dst)
+            print("❌ Short copy was not detected")
+            return False
+        except IOError:
+            pass
+        finally:
+            os.sendfile = real_sendfile
+    
+    print("✅ Image copy works")
+    return True
+
+
 def test_environment_validation():
     """Test environment validation (mock)."""
     print("Testing environment validation...")
@@ -117,7 +296,7 @@ def test_command_execution():
     
     # Test a simple command that should work
     try:
-        result = generator.run_command(['echo', 'test'], check=False)
+        result = generator.run_command(['echo', 'test'], check=False, capture=True)
         if result.returncode == 0 and 'test' in result.stdout:
             print("✅ Command execution works")
             return True
@@ -138,6 +317,10 @@ def main():
         test_config_loading,
         test_templates_file,
         test_image_listing,
+        test_templates_cache,
+        test_download_freshness,
+        test_download_resume,
+        test_image_copy,
         test_environment_validation,
         test_command_execution
     ]